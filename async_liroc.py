@@ -0,0 +1,46 @@
+from .liroc import Liroc
+from .i2c.async_i2c import AsyncI2C
+
+
+class AsyncLiroc:
+    def __init__(self, liroc: Liroc, i2c: AsyncI2C):
+        self.liroc = liroc
+        self.i2c = i2c
+
+    @classmethod
+    async def create(cls, i2c: AsyncI2C) -> "AsyncLiroc":
+        # the bulk readout of the constructor runs off the event loop
+        return cls(await i2c.run(Liroc, i2c.i2c), i2c)
+
+    @property
+    def channels(self) -> list:
+        return self.liroc.channels
+
+    @property
+    def common(self):
+        return self.liroc.common
+
+    def save(self) -> dict:
+        return self.liroc.save()
+
+    def to_json(self) -> dict:
+        return self.liroc.to_json()
+
+    async def read(self) -> None:
+        await self.i2c.run(self.liroc.read)
+
+    async def load(self, configuration: dict, apply: bool = False) -> list:
+        return await self.i2c.run(self.liroc.load, configuration, apply)
+
+    async def flush(self) -> None:
+        await self.i2c.run(self.liroc.flush)
+
+    async def set(self, name: str, value, channel: int = None) -> None:
+        # property setter of a channel, of the common block, or a chip-wide array setter with channel="all"
+        if channel is None:
+            target = self.liroc.common
+        elif channel == "all":
+            target = self.liroc
+        else:
+            target = self.liroc.channels[channel]
+        await self.i2c.run(setattr, target, name, value)
@@ -0,0 +1,120 @@
+# Bus cost of common operations against a simulated chip.
+# Run from the directory containing the package: python -m <package>.benchmarks.transactions [--check]
+import argparse
+import sys
+import time
+
+from ..liroc import Liroc
+from ..i2c.i2c import I2C
+from ..i2c.simulated import SimulatedLiroc
+from ..sweep import threshold_sweep, local_threshold_sweep
+
+ADDRESS = 0x10
+
+# maximum transactions per benchmark, checked with --check
+BUDGETS = {
+    "init": 7,
+    "load (no change)": 0,
+    "load (full chip)": 4,
+    "save": 0,
+    "channel setter": 1,
+    "common setter": 1,
+    "threshold setter": 2048,
+    "threshold sweep": 1024,
+    "local sweep": 256,
+}
+
+
+def bench_init(device: SimulatedLiroc) -> None:
+    Liroc(I2C(device, ADDRESS))
+
+
+def bench_load_unchanged(device: SimulatedLiroc, liroc: Liroc) -> None:
+    liroc.load(liroc.save(), apply=True)
+
+
+def bench_load_full(device: SimulatedLiroc, liroc: Liroc) -> None:
+    configuration = liroc.save()
+    for channel in configuration["channels"]:
+        for group in channel["groups"]:
+            for register in group["registers"]:
+                register["value"] ^= 0x01
+    for group in configuration["common"]["groups"]:
+        for register in group["registers"]:
+            register["value"] ^= 0x01
+    liroc.load(configuration, apply=True)
+
+
+def bench_save(device: SimulatedLiroc, liroc: Liroc) -> None:
+    liroc.save()
+
+
+def bench_channel_setter(device: SimulatedLiroc, liroc: Liroc) -> None:
+    liroc.channels[0].channel_by_channel_threshold_adjustment ^= 0x01
+
+
+def bench_common_setter(device: SimulatedLiroc, liroc: Liroc) -> None:
+    liroc.common.discriminator_hysteresis ^= 0x01
+
+
+def bench_threshold_setter(device: SimulatedLiroc, liroc: Liroc) -> None:
+    for value in range(1024):
+        liroc.common.threshold_adjustment = value
+
+
+def bench_threshold_sweep(device: SimulatedLiroc, liroc: Liroc) -> None:
+    for _ in threshold_sweep(liroc, range(1024)):
+        pass
+
+
+def bench_local_sweep(device: SimulatedLiroc, liroc: Liroc) -> None:
+    for _ in local_threshold_sweep(liroc, range(128)):
+        pass
+
+
+def run(name: str, benchmark, latency: float, byte_time: float, setup: bool = True) -> dict:
+    device = SimulatedLiroc(ADDRESS, Liroc().registers, latency, byte_time)
+    args = (device, Liroc(I2C(device, ADDRESS))) if setup else (device,)
+    device.reset()
+
+    start = time.perf_counter()
+    benchmark(*args)
+    elapsed = time.perf_counter() - start
+
+    return {"name": name,
+            "transactions": device.transactions,
+            "messages": device.messages,
+            "bytes": device.bytes,
+            "time": elapsed}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="LIROC bus transaction benchmarks")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated latency per transaction in s")
+    parser.add_argument("--byte-time", type=float, default=0.0, help="simulated time per byte in s, 9e-5 for 100 kHz")
+    parser.add_argument("--check", action="store_true", help="fail if a benchmark exceeds its transaction budget")
+    args = parser.parse_args()
+
+    results = [run("init", bench_init, args.latency, args.byte_time, setup=False),
+               run("load (no change)", bench_load_unchanged, args.latency, args.byte_time),
+               run("load (full chip)", bench_load_full, args.latency, args.byte_time),
+               run("save", bench_save, args.latency, args.byte_time),
+               run("channel setter", bench_channel_setter, args.latency, args.byte_time),
+               run("common setter", bench_common_setter, args.latency, args.byte_time),
+               run("threshold setter", bench_threshold_setter, args.latency, args.byte_time),
+               run("threshold sweep", bench_threshold_sweep, args.latency, args.byte_time),
+               run("local sweep", bench_local_sweep, args.latency, args.byte_time)]
+
+    print(f"{'benchmark':<20}{'transactions':>14}{'messages':>10}{'bytes':>8}{'time [ms]':>12}")
+    failed = False
+    for result in results:
+        over = result["transactions"] > BUDGETS[result["name"]]
+        failed |= over
+        print(f"{result['name']:<20}{result['transactions']:>14}{result['messages']:>10}{result['bytes']:>8}"
+              f"{result['time'] * 1e3:>12.2f}{'  over budget' if over else ''}")
+
+    return 1 if args.check and failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
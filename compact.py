@@ -0,0 +1,88 @@
+from .blocks.channel import Channel
+from .blocks.common import Common
+
+from .components.registerfile import BlockLayout, RegisterFile
+
+CHANNEL_LAYOUT = BlockLayout(Channel(0).groups)
+COMMON_LAYOUT = BlockLayout(Common().groups)
+
+# (group, address) of every byte of a chip register image
+IMAGE_LAYOUT = [(channel + spec.group, spec.address) for channel in range(64) for spec in CHANNEL_LAYOUT.registers] + \
+               [(spec.group, spec.address) for spec in COMMON_LAYOUT.registers]
+
+
+class CompactChannel(RegisterFile):
+    __slots__ = ()
+
+    @property
+    def index(self) -> int:
+        return self.base
+
+    def save(self) -> dict:
+        return {"channel": self.index,
+                "groups": self.save_groups()}
+
+    def load(self, configuration: dict) -> bool:
+        if "groups" in configuration:
+            self.load_groups(configuration["groups"])
+        return True
+
+    def to_json(self) -> dict:
+        return {"groups": self.groups_to_json()}
+
+
+class CompactCommon(RegisterFile):
+    __slots__ = ()
+
+    def save(self) -> dict:
+        return {"groups": self.save_groups()}
+
+    def load(self, configuration: dict) -> bool:
+        if "groups" in configuration:
+            self.load_groups(configuration["groups"])
+        return True
+
+    def to_json(self) -> dict:
+        return {"groups": self.groups_to_json()}
+
+
+class CompactLiroc:
+    # one bytearray register image per chip, for modelling many chips offline
+    __slots__ = ("version", "image", "channels", "common")
+
+    def __init__(self):
+        self.version = 1
+        self.image = bytearray(CHANNEL_LAYOUT.default * 64 + COMMON_LAYOUT.default)
+
+        view = memoryview(self.image)
+        size = CHANNEL_LAYOUT.size
+        self.channels = [CompactChannel(view[i * size:(i + 1) * size], CHANNEL_LAYOUT, i) for i in range(64)]
+        self.common = CompactCommon(view[64 * size:], COMMON_LAYOUT)
+
+    def save(self):
+        return {
+            "version": self.version,
+            "channels": [channel.save() for channel in self.channels],
+            "common": self.common.save()
+        }
+
+    def load(self, configuration: dict):
+        if "version" in configuration:
+            if configuration["version"] >= self.version:
+                if "channels" in configuration:
+                    for channel in self.channels:
+                        channel.load(configuration["channels"][channel.index])
+                if "common" in configuration:
+                    self.common.load(configuration["common"])
+
+    def load_image(self, image: bytes) -> None:
+        if len(image) != len(self.image):
+            raise ValueError(f"image size {len(image)} does not match chip image size {len(self.image)}")
+        self.image[:] = image
+
+    def to_json(self):
+        return {
+            "version": self.version,
+            "channels": [channel.to_json() for channel in self.channels],
+            "common": self.common.to_json()
+        }
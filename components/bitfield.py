@@ -2,21 +2,38 @@ class BitField():
     def __init__(self, start_bit: int, length: int, default_value: int, name: str, description: str) -> None:
         self.start_bit = start_bit
         self.length = length
-        self.value = default_value
         self.name = name
         self.description = description
+        self._bitmask = ((1 << length) - 1) << start_bit
+        # once attached to a register the value lives in the register image
+        self.register = None
+        self._value = default_value
 
     @property
     def bitmask(self) -> int:
-        bitmask = 1 << self.start_bit
-        for i in range(self.length - 1):
-            bitmask |= self.start_bit + i
-            bitmask <<= 1
-        return bitmask
+        return self._bitmask
+
+    @property
+    def value(self) -> int:
+        if self.register is None:
+            return self._value
+        return (self.register.value & self._bitmask) >> self.start_bit
+
+    @value.setter
+    def value(self, value: int) -> None:
+        if self.register is None:
+            self._value = value
+        else:
+            self.register.value = (self.register.value & ~self._bitmask) | ((value << self.start_bit) & self._bitmask)
 
     def update(self, value: int) -> None:
+        # extract field from a full register value
         self.value = (value & self.bitmask) >> self.start_bit
 
+    def set(self, value: int) -> None:
+        # set field value directly
+        self.value = value & ((1 << self.length) - 1)
+
     def to_json(self) -> dict:
         return {
             "name": self.name,
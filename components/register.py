@@ -1,4 +1,3 @@
-
 from .bitfield import BitFieldArray, BitField
 from ..i2c.i2c import I2C
 
@@ -8,35 +7,47 @@ class Register():
         self.group = None
         self.address = address
         self.fields = bitfields
+        # shadow state: the cached register image, the fields are views of its bits
+        self.mask = 0
+        self.value = 0
+        for field in self.fields:
+            self.mask |= field.bitmask
+            self.value |= (field.value << field.start_bit) & field.bitmask
+            field.register = self
+        self.dirty = False
+        self.write_back = False
 
     @property
     def i2c_address(self) -> list:
         r0 = (self.group & 0x07) << 5 | self.address & 0x1F
-        r1 = self.group & 0xF8 >> 3
+        r1 = (self.group & 0xF8) >> 3
         return [r0, r1]
 
     def load(self, value: int):
-        for field in self.fields:
-            field.update(value)
+        self.value = value & self.mask
 
     def save(self) -> dict:
-        value = 0
-        for field in self.fields:
-            value |= field.value & field.bitmask
         return {"group": self.group,
                 "address": self.address,
-                "value": value}
+                "value": self.value}
 
     def update(self, i2c: I2C, field: BitField, value: int) -> None:
-        # update field
-        field.update(value)
+        self.update_bits(i2c, field.bitmask, field.start_bit, value)
+
+    def update_bits(self, i2c: I2C, mask: int, shift: int, value: int) -> None:
+        # shadow update and write are atomic with respect to other users of the bus
+        with i2c.lock:
+            self.value = (self.value & ~mask) | ((value << shift) & mask)
+            self.dirty = True
 
-        # update hardware
-        reg_value = i2c.read(self.i2c_address(), 1)[0]
-        reg_value &= ~field.bitmask
-        reg_value |= field.value << field.start_bit
+            # write-through, the cached image is trusted so no read is needed
+            if not self.write_back:
+                self.flush(i2c)
 
-        i2c.write(self.i2c_address, reg_value)
+    def flush(self, i2c: I2C) -> None:
+        if self.dirty and i2c:
+            i2c.write(self.i2c_address, self.value)
+            self.dirty = False
 
     def to_json(self) -> dict:
         return {
@@ -74,8 +85,47 @@ class RegisterGroup(list):
 
 
 class RegisterGroupArray(list):
-    def __init__(self, registergroups: list) -> None:
+    # compiled field indexes, shared by all arrays with the same layout
+    _layouts = {}
+
+    def __init__(self, registergroups: list, index: dict = None) -> None:
         super().__init__(registergroups)
+        # a precompiled index of the layout skips compiling it for every array
+        self.index = self.compile(self) if index is None else index
+
+    @classmethod
+    def compile(cls, groups: list) -> dict:
+        layout = tuple(tuple((register.address, tuple(field.name for field in register.fields))
+                             for register in group)
+                       for group in groups)
+        index = cls._layouts.get(layout)
+        if index is None:
+            # name -> (group position, register position, field position)
+            index = {}
+            for g, group in enumerate(layout):
+                for r, (_, names) in enumerate(group):
+                    for f, name in enumerate(names):
+                        index.setdefault(name, (g, r, f))
+            cls._layouts[layout] = index
+        return index
+
+    @property
+    def write_back(self) -> bool:
+        return all(register.write_back for group in self for register in group)
+
+    @write_back.setter
+    def write_back(self, enable: bool) -> None:
+        for group in self:
+            for register in group:
+                register.write_back = enable
+
+    @property
+    def registers(self) -> list:
+        return [register for group in self for register in group]
+
+    @property
+    def dirty(self) -> list:
+        return [register for group in self for register in group if register.dirty]
 
     def get_register(self, index: int) -> Register | None:
         for group in self:
@@ -84,18 +134,42 @@ class RegisterGroupArray(list):
         return None
 
     def get_field(self, name: str) -> tuple[Register, BitField] | None:
-        for group in self:
-            for register in group:
-                for field in register.fields:
-                    if field.name == name:
-                        return register, field
-        return None
+        location = self.index.get(name)
+        if location is None:
+            return None
+        register = self[location[0]][location[1]]
+        return register, register.fields[location[2]]
+
+    def flush(self, i2c: I2C) -> None:
+        if i2c:
+            with i2c.lock:
+                write_registers(i2c, self.dirty)
+
+    def read(self, i2c: I2C) -> None:
+        read_registers(i2c, self.registers)
 
     def load(self, group_config: dict):
         for config in group_config:
-            index = config["index"]
-            if len(self) > index:
-                self[index].load(group_config[index])
+            group = self.get_register(config["index"])
+            if group is not None:
+                group.load(config)
 
     def to_json(self) -> dict:
         return [group.to_json() for group in self]
+
+
+def read_registers(i2c: I2C, registers: list) -> None:
+    # the shadow is updated under the bus lock, together with the transfer
+    with i2c.lock:
+        values = i2c.read_many([register.i2c_address for register in registers], 1)
+        for register, value in zip(registers, values):
+            register.load(value[0])
+            register.dirty = False
+
+
+def write_registers(i2c: I2C, registers: list) -> None:
+    with i2c.lock:
+        i2c.write_many([register.i2c_address for register in registers],
+                       [register.value for register in registers])
+        for register in registers:
+            register.dirty = False
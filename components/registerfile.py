@@ -0,0 +1,126 @@
+from .bitfield import BitField
+from .register import Register, RegisterGroupArray
+
+
+class FieldSpec():
+    __slots__ = ("name", "start_bit", "length", "bitmask", "description")
+
+    def __init__(self, field: BitField) -> None:
+        self.name = field.name
+        self.start_bit = field.start_bit
+        self.length = field.length
+        self.bitmask = field.bitmask
+        self.description = field.description
+
+
+class RegisterSpec():
+    __slots__ = ("group", "address", "fields", "default")
+
+    def __init__(self, group: int, register: Register) -> None:
+        self.group = group
+        self.address = register.address
+        self.fields = tuple(FieldSpec(field) for field in register.fields)
+        self.default = register.value
+
+
+class BlockLayout():
+    # static metadata of a block, shared by every RegisterFile using it
+    __slots__ = ("groups", "registers", "index", "size", "default")
+
+    def __init__(self, groups: RegisterGroupArray, base: int = 0) -> None:
+        self.groups = tuple((group.index - base, tuple(RegisterSpec(group.index - base, register) for register in group))
+                            for group in groups)
+        self.registers = tuple(spec for _, specs in self.groups for spec in specs)
+        self.size = len(self.registers)
+        self.default = bytes(spec.default for spec in self.registers)
+
+        # name -> (offset, field spec), from the compiled index of the groups
+        offsets = {}
+        for g, (_, specs) in enumerate(self.groups):
+            for r in range(len(specs)):
+                offsets[(g, r)] = len(offsets)
+        self.index = {name: (offsets[(g, r)], self.groups[g][1][r].fields[f]) for name, (g, r, f) in groups.index.items()}
+
+
+class FieldView():
+    __slots__ = ("image", "offset", "spec")
+
+    def __init__(self, image: memoryview, offset: int, spec: FieldSpec) -> None:
+        self.image = image
+        self.offset = offset
+        self.spec = spec
+
+    @property
+    def value(self) -> int:
+        return (self.image[self.offset] & self.spec.bitmask) >> self.spec.start_bit
+
+    @value.setter
+    def value(self, value: int) -> None:
+        self.image[self.offset] = (self.image[self.offset] & ~self.spec.bitmask) | ((value << self.spec.start_bit) & self.spec.bitmask)
+
+    def to_json(self) -> dict:
+        return {
+            "name": self.spec.name,
+            "value": self.value,
+            "start_bit": self.spec.start_bit,
+            "length": self.spec.length,
+            "description": self.spec.description
+        }
+
+
+class RegisterFile():
+    # zero-copy view of one block in a chip register image
+    __slots__ = ("image", "layout", "base")
+
+    def __init__(self, image: memoryview, layout: BlockLayout, base: int = 0) -> None:
+        self.image = image
+        self.layout = layout
+        self.base = base
+
+    def get_field(self, name: str) -> FieldView | None:
+        location = self.layout.index.get(name)
+        if location is None:
+            return None
+        return FieldView(self.image, *location)
+
+    def save_groups(self) -> list:
+        groups = []
+        offset = 0
+        for group, specs in self.layout.groups:
+            registers = []
+            for spec in specs:
+                registers.append({"group": self.base + group,
+                                  "address": spec.address,
+                                  "value": self.image[offset]})
+                offset += 1
+            groups.append({"index": self.base + group,
+                           "registers": registers})
+        return groups
+
+    def load_groups(self, group_config: list) -> None:
+        offsets = {}
+        offset = 0
+        for group, specs in self.layout.groups:
+            offsets[self.base + group] = offset, len(specs)
+            offset += len(specs)
+
+        for config in group_config:
+            if config["index"] in offsets:
+                offset, size = offsets[config["index"]]
+                for register in config["registers"]:
+                    if register["address"] < size:
+                        self.image[offset + register["address"]] = register["value"]
+
+    def groups_to_json(self) -> list:
+        groups = []
+        offset = 0
+        for group, specs in self.layout.groups:
+            registers = []
+            for spec in specs:
+                registers.append({"group": self.base + group,
+                                  "address": spec.address,
+                                  "fields": [FieldView(self.image, offset, field).to_json() for field in spec.fields]})
+                offset += 1
+            groups.append({"index": self.base + group,
+                           "registers": registers})
+        return groups
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import pickle
+
+from .bitfield import BitField
+from .register import Register, RegisterGroup, RegisterGroupArray
+
+MAPS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "maps")
+
+
+class FieldAccessor():
+    # descriptor for a block property, parts are (group position, register position, field position, mask, shift, length)
+    # of the fields making up the value, most significant first
+    def __init__(self, name: str, parts: tuple) -> None:
+        self.name = name
+        self.parts = parts
+
+    def __get__(self, block, owner=None):
+        if block is None:
+            return self
+        value = 0
+        for g, r, _, mask, shift, length in self.parts:
+            value = value << length | (block.groups[g][r].value & mask) >> shift
+        return value
+
+    def __set__(self, block, value: int) -> None:
+        if not block.i2c:
+            return
+        offset = sum(part[5] for part in self.parts)
+        for g, r, _, mask, shift, length in self.parts:
+            offset -= length
+            block.groups[g][r].update_bits(block.i2c, mask, shift, value >> offset)
+
+
+class RegisterMap():
+    # compiled form of a maps/liroc_v<version>.json register map
+    _maps = {}
+    # bumped when the compiled form changes, part of the cache file name
+    COMPILED = 2
+
+    def __init__(self, version: int, blocks: dict) -> None:
+        # blocks: name -> (groups, index, accessors), groups as nested tuples
+        # ((index, ((address, ((start_bit, length, default, name, description), ...)), ...)), ...),
+        # index as field name -> (group position, register position, field position) shared by
+        # every RegisterGroupArray built from the map, and accessors as name -> parts of FieldAccessor
+        self.version = version
+        self.blocks = blocks
+        self._metadata = None
+
+        # block -> ((register position in the block image, start_bit, length), ...) of all fields in order
+        self.fields = {name: tuple((position, field[0], field[1])
+                                   for position, fields in enumerate(fields for _, registers in groups for _, fields in registers)
+                                   for field in fields)
+                       for name, (groups, _, _) in blocks.items()}
+
+    @classmethod
+    def compile(cls, register_map: dict) -> "RegisterMap":
+        blocks = {}
+        for name, block in register_map["blocks"].items():
+            groups = tuple((group["index"], tuple((register["address"], tuple((field["start_bit"], field["length"], field["default"], field["name"], field["description"])
+                                                                            for field in register["fields"]))
+                                                  for register in group["registers"]))
+                           for group in block["groups"])
+
+            # the first field of a name wins
+            index = {}
+            for g, (_, registers) in enumerate(groups):
+                for r, (_, fields) in enumerate(registers):
+                    for f, field in enumerate(fields):
+                        index.setdefault(field[3], (g, r, f))
+
+            accessors = {}
+            for prop, names in block["properties"].items():
+                parts = []
+                for field in names:
+                    g, r, f = index[field]
+                    start_bit, length = groups[g][1][r][1][f][:2]
+                    parts.append((g, r, f, ((1 << length) - 1) << start_bit, start_bit, length))
+                accessors[prop] = tuple(parts)
+            blocks[name] = (groups, index, accessors)
+        return cls(register_map["version"], blocks)
+
+    @classmethod
+    def load(cls, version: int) -> "RegisterMap":
+        # compiled once per process, and cached across processes next to the map keyed by its content
+        if version in cls._maps:
+            return cls._maps[version]
+
+        path = os.path.join(MAPS, f"liroc_v{version}.json")
+        with open(path, "rb") as f:
+            source = f.read()
+        cache = os.path.join(MAPS, "__pycache__", f"liroc_v{version}.{cls.COMPILED}.{hashlib.sha1(source).hexdigest()[:16]}.pickle")
+
+        try:
+            with open(cache, "rb") as f:
+                register_map = cls(*pickle.load(f))
+        except Exception:
+            # missing, unreadable or stale cache, recompile from the JSON source
+            register_map = cls.compile(json.loads(source))
+            try:
+                os.makedirs(os.path.dirname(cache), exist_ok=True)
+                with open(cache, "wb") as f:
+                    pickle.dump((register_map.version, register_map.blocks), f)
+            except OSError:
+                pass
+
+        cls._maps[version] = register_map
+        return register_map
+
+    @property
+    def metadata(self) -> str:
+        # static layout as JSON text, serialized once. Field order matches the values of Liroc.values
+        if self._metadata is None:
+            self._metadata = json.dumps({
+                "version": self.version,
+                "blocks": {name: {"groups": [{"index": index,
+                                              "registers": [{"address": address,
+                                                             "fields": [{"name": field[3],
+                                                                         "start_bit": field[0],
+                                                                         "length": field[1],
+                                                                         "description": field[4]} for field in fields]}
+                                                            for address, fields in registers]}
+                                             for index, registers in groups],
+                                  "properties": {prop: [groups[g][1][r][1][f][3] for g, r, f, _, _, _ in parts] for prop, parts in accessors.items()}}
+                           for name, (groups, _, accessors) in self.blocks.items()}})
+        return self._metadata
+
+    def build(self, block: str, base: int = 0) -> RegisterGroupArray:
+        groups, index, _ = self.blocks[block]
+        return RegisterGroupArray([RegisterGroup(base + group, [Register(address, [BitField(*field) for field in fields])
+                                                                for address, fields in registers])
+                                   for group, registers in groups],
+                                  index)
+
+    def accessors(self, block: str) -> dict:
+        _, _, accessors = self.blocks[block]
+        return {name: FieldAccessor(name, parts) for name, parts in accessors.items()}
+
+    def install(self, cls: type, block: str) -> type:
+        cls.register_map = self
+        for name, accessor in self.accessors(block).items():
+            setattr(cls, name, accessor)
+        return cls
+
+    def block_class(self, cls: type, block: str) -> type:
+        # subclass of cls with the layout and accessors of this map revision,
+        # properties missing in this revision read as None like unknown fields did
+        if cls.register_map is self:
+            return cls
+
+        if "_revisions" not in cls.__dict__:
+            cls._revisions = {}
+        revisions = cls._revisions
+        if self.version not in revisions:
+            missing = {name: None for name, value in vars(cls).items() if isinstance(value, FieldAccessor)}
+            revisions[self.version] = self.install(type(f"{cls.__name__}V{self.version}", (cls,), missing), block)
+        return revisions[self.version]
@@ -0,0 +1,28 @@
+import json
+
+
+def iterencode(chips, values: bool = False):
+    # JSON text of {name: chip} in chunks of one channel, without building the nested structure
+    # of all chips first. chips is a dict or an iterable of (name, Liroc) pairs such as a LirocArray
+    items = chips.items() if isinstance(chips, dict) else chips
+
+    yield "{"
+    for n, (name, liroc) in enumerate(items):
+        if isinstance(name, tuple):
+            name = ":".join(str(part) for part in name)
+        yield ("," if n else "") + json.dumps(str(name)) + ":"
+
+        if values:
+            yield json.dumps(liroc.values())
+            continue
+
+        yield '{"version":' + json.dumps(liroc.version) + ',"channels":['
+        for i, channel in enumerate(liroc.channels):
+            yield ("," if i else "") + json.dumps(channel.to_json())
+        yield '],"common":' + json.dumps(liroc.common.to_json()) + "}"
+    yield "}"
+
+
+def dump(chips, fp, values: bool = False) -> None:
+    for chunk in iterencode(chips, values):
+        fp.write(chunk)
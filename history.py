@@ -0,0 +1,80 @@
+from .liroc import Liroc
+from .compact import CompactLiroc, IMAGE_LAYOUT
+
+
+class ConfigurationHistory:
+    # register images per version, stored as register-level deltas with periodic full keyframes
+    def __init__(self, keyframe_interval: int = 32):
+        self.keyframe_interval = keyframe_interval
+        # version -> {image position: value} changed since the previous version
+        self._deltas = []
+        # version -> full image
+        self._keyframes = {}
+        self._head = None
+
+    def __len__(self) -> int:
+        return len(self._deltas)
+
+    def commit(self, liroc: Liroc | CompactLiroc | dict) -> int:
+        if isinstance(liroc, dict):
+            configuration = liroc
+            liroc = CompactLiroc()
+            liroc.load(configuration)
+        image = bytes(liroc.image)
+
+        if self._head is None:
+            delta = dict(enumerate(image))
+        else:
+            delta = {position: value for position, (value, previous) in enumerate(zip(image, self._head)) if value != previous}
+
+        version = len(self._deltas)
+        self._deltas.append(delta)
+        if version % self.keyframe_interval == 0:
+            self._keyframes[version] = image
+        self._head = image
+        return version
+
+    def _keyframe(self, version: int) -> int:
+        return version - version % self.keyframe_interval
+
+    def _value(self, position: int, version: int) -> int:
+        keyframe = self._keyframe(version)
+        for v in range(version, keyframe, -1):
+            if position in self._deltas[v]:
+                return self._deltas[v][position]
+        return self._keyframes[keyframe][position]
+
+    def image(self, version: int) -> bytes:
+        keyframe = self._keyframe(version)
+        image = bytearray(self._keyframes[keyframe])
+        for v in range(keyframe + 1, version + 1):
+            for position, value in self._deltas[v].items():
+                image[position] = value
+        return bytes(image)
+
+    def get(self, version: int) -> dict:
+        liroc = CompactLiroc()
+        liroc.load_image(self.image(version))
+        return liroc.save()
+
+    def diff(self, a: int, b: int) -> list:
+        # only positions touched by the deltas between the two versions are compared
+        positions = set()
+        for v in range(min(a, b) + 1, max(a, b) + 1):
+            positions.update(self._deltas[v])
+
+        changes = []
+        for position in sorted(positions):
+            previous = self._value(position, a)
+            value = self._value(position, b)
+            if previous != value:
+                group, address = IMAGE_LAYOUT[position]
+                changes.append({"group": group,
+                                "address": address,
+                                "previous": previous,
+                                "value": value})
+        return changes
+
+    def restore(self, liroc: Liroc, version: int, apply: bool = True) -> list:
+        # writes only the registers that differ from the chip's current shadow state
+        return liroc.load_image(self.image(version), apply)
@@ -0,0 +1,29 @@
+import asyncio
+from concurrent.futures import Executor
+
+from .i2c import I2C
+
+
+class AsyncI2C:
+    def __init__(self, i2c: I2C, executor: Executor = None):
+        # i2c may be any object with the I2C interface, e.g. LocalI2C in tests
+        self.i2c = i2c
+        self.executor = executor
+        self.lock = asyncio.Lock()
+
+    async def run(self, function, *args):
+        # blocking bus access runs in the executor, one call at a time
+        async with self.lock:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def read(self, registers: list, length: int) -> list:
+        return await self.run(self.i2c.read, registers, length)
+
+    async def write(self, registers: list, value: int) -> None:
+        await self.run(self.i2c.write, registers, value)
+
+    async def read_many(self, registers: list, length: int = 1) -> list:
+        return await self.run(self.i2c.read_many, registers, length)
+
+    async def write_many(self, registers: list, values: list) -> None:
+        await self.run(self.i2c.write_many, registers, values)
@@ -1,26 +1,116 @@
-from smbus2 import SMBus, i2c_msg
+import threading
+import time
+import weakref
 
-from ..components.bitfield import BitField
+from smbus2 import SMBus, i2c_msg
 
 
 class I2C:
-    def __init__(self, bus: SMBus, dev_address: int):
+    # I2C_RDWR_IOCTL_MAX_MSGS of the linux i2c-dev driver
+    MAX_MESSAGES = 42
+
+    # one lock per bus, shared by all devices on it, dropped with the bus
+    _bus_locks = weakref.WeakKeyDictionary()
+    _bus_locks_lock = threading.Lock()
+
+    def __init__(self, bus: SMBus, dev_address: int, max_messages: int = MAX_MESSAGES):
         self.bus = bus
         self.address = dev_address
+        self.max_messages = max_messages
+        # callables hook(messages, elapsed) run after every transaction
+        self.hooks = []
+        self.lock = self.bus_lock(bus)
+        self.last_activity = 0.0
+
+    @classmethod
+    def bus_lock(cls, bus: SMBus) -> threading.RLock:
+        with cls._bus_locks_lock:
+            lock = cls._bus_locks.get(bus)
+            if lock is None:
+                lock = cls._bus_locks[bus] = threading.RLock()
+            return lock
+
+    @staticmethod
+    def decode(r0: int, r1: int) -> tuple[int, int]:
+        # (group, address) from the two register address bytes
+        return r1 << 3 | r0 >> 5, r0 & 0x1F
+
+    def _transfer(self, *messages: i2c_msg) -> None:
+        if not self.hooks:
+            self.bus.i2c_rdwr(*messages)
+            return
+
+        start = time.perf_counter()
+        self.bus.i2c_rdwr(*messages)
+        elapsed = time.perf_counter() - start
+        for hook in self.hooks:
+            hook(messages, elapsed)
 
     def _write(self, registers: list, value: int):
-        registers.append(value)
-        write_msg = i2c_msg.write(self.address, registers)
-        self.bus.i2c_rdwr(write_msg)
+        write_msg = i2c_msg.write(self.address, registers + [value])
+        self._transfer(write_msg)
 
-    def _read(self, registers:list, length: int) -> list:
+    def _read(self, registers: list, length: int) -> list:
         write_msg = i2c_msg.write(self.address, registers)
         read_msg = i2c_msg.read(self.address, length)
-        self.bus.i2c_rdwr(write_msg, read_msg)
+        self._transfer(write_msg, read_msg)
         return list(read_msg)
-    
-    def write(self, field: BitField) -> None:
-        value = self._read(self.i2c_address(), 1)[0]
-        value &= ~field.bitmask
-        value |= field.value << field.start_bit
-        self._write(self.i2c_address, value)
+
+    def _read_many(self, registers: list, length: int) -> list:
+        messages = []
+        reads = []
+        for address in registers:
+            read_msg = i2c_msg.read(self.address, length)
+            messages += [i2c_msg.write(self.address, address), read_msg]
+            reads.append(read_msg)
+        self._transfer(*messages)
+        return [list(read_msg) for read_msg in reads]
+
+    def _write_many(self, registers: list, values: list) -> None:
+        messages = [i2c_msg.write(self.address, address + [value]) for address, value in zip(registers, values)]
+        self._transfer(*messages)
+
+    def read(self, registers: list, length: int) -> list:
+        with self.lock:
+            self.last_activity = time.monotonic()
+            return self._read(registers, length)
+
+    def write(self, registers: list, value: int) -> None:
+        with self.lock:
+            self.last_activity = time.monotonic()
+            self._write(registers, value)
+
+    def read_many(self, registers: list, length: int = 1) -> list:
+        # one write+read message pair per register, packed into as few
+        # i2c_rdwr transactions as the adapter allows
+        chunk = max(1, self.max_messages // 2)
+        values = []
+        with self.lock:
+            self.last_activity = time.monotonic()
+            for i in range(0, len(registers), chunk):
+                values += self._read_many(registers[i:i + chunk], length)
+        return values
+
+    def write_many(self, registers: list, values: list) -> None:
+        chunk = max(1, self.max_messages)
+        with self.lock:
+            self.last_activity = time.monotonic()
+            for i in range(0, len(registers), chunk):
+                self._write_many(registers[i:i + chunk], values[i:i + chunk])
+
+    def read_many_if_idle(self, registers: list, idle: float, length: int = 1, callback=None):
+        # background read, gives up instead of waiting if the bus is in use or was used
+        # within the last idle seconds. It does not count as bus activity itself.
+        # callback(values) runs before the lock is released and its result is returned.
+        if not self.lock.acquire(blocking=False):
+            return None
+        try:
+            if time.monotonic() - self.last_activity < idle:
+                return None
+            chunk = max(1, self.max_messages // 2)
+            values = []
+            for i in range(0, len(registers), chunk):
+                values += self._read_many(registers[i:i + chunk], length)
+            return callback(values) if callback else values
+        finally:
+            self.lock.release()
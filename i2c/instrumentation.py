@@ -0,0 +1,72 @@
+from contextlib import contextmanager
+
+from smbus2 import i2c_msg
+from smbus2.smbus2 import I2C_M_RD
+
+from .i2c import I2C
+
+
+class BusStats:
+    # hook for I2C.hooks, collects counters, latency histogram and per-register accesses
+    BUCKETS = 24
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.transactions = 0
+        self.messages = 0
+        self.reads = 0
+        self.writes = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.bytes = 0
+        self.time = 0.0
+        # bucket n counts transactions of [2^(n-1), 2^n) µs
+        self.latency = [0] * self.BUCKETS
+        # (group, address) -> [reads, writes]
+        self.heatmap = {}
+
+    def __call__(self, messages: tuple[i2c_msg, ...], elapsed: float) -> None:
+        self.transactions += 1
+        self.messages += len(messages)
+        self.time += elapsed
+        self.latency[min(int(elapsed * 1e6).bit_length(), self.BUCKETS - 1)] += 1
+
+        pointer = None
+        for message in messages:
+            self.bytes += 1 + message.len
+            if message.flags & I2C_M_RD:
+                self.reads += 1
+                self.bytes_read += message.len
+                self.heatmap.setdefault(pointer, [0, 0])[0] += 1
+            else:
+                data = bytes(message)
+                pointer = I2C.decode(data[0], data[1])
+                if message.len > 2:
+                    self.writes += 1
+                    self.bytes_written += message.len - 2
+                    self.heatmap.setdefault(pointer, [0, 0])[1] += 1
+
+    def summary(self) -> dict:
+        return {"transactions": self.transactions,
+                "messages": self.messages,
+                "reads": self.reads,
+                "writes": self.writes,
+                "bytes_read": self.bytes_read,
+                "bytes_written": self.bytes_written,
+                "bytes": self.bytes,
+                "time": self.time,
+                "latency": {f"<{1 << n}us": count for n, count in enumerate(self.latency) if count},
+                "heatmap": {f"{group}:{address}": accesses for (group, address), accesses in sorted(self.heatmap.items())}}
+
+
+@contextmanager
+def profile(i2c: I2C, stats: BusStats = None):
+    # with profile(liroc.i2c) as stats: liroc.load(...)
+    stats = BusStats() if stats is None else stats
+    i2c.hooks.append(stats)
+    try:
+        yield stats
+    finally:
+        i2c.hooks.remove(stats)
@@ -0,0 +1,27 @@
+import threading
+
+
+class LocalI2C:
+    # in-memory stand-in for I2C, registers are keyed by their two address bytes
+    def __init__(self, dev_address: int = 0):
+        self.address = dev_address
+        self.memory = {}
+        self.lock = threading.RLock()
+
+    def read(self, registers: list, length: int) -> list:
+        return [self.memory.get((registers[0] + i, registers[1]), 0) for i in range(length)]
+
+    def write(self, registers: list, value: int) -> None:
+        self.memory[(registers[0], registers[1])] = value
+
+    def read_many(self, registers: list, length: int = 1) -> list:
+        return [self.read(address, length) for address in registers]
+
+    def write_many(self, registers: list, values: list) -> None:
+        for address, value in zip(registers, values):
+            self.write(address, value)
+
+    def read_many_if_idle(self, registers: list, idle: float, length: int = 1, callback=None):
+        with self.lock:
+            values = self.read_many(registers, length)
+            return callback(values) if callback else values
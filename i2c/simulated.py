@@ -0,0 +1,48 @@
+import time
+
+from smbus2 import i2c_msg
+from smbus2.smbus2 import I2C_M_RD
+
+from .i2c import I2C
+
+
+class SimulatedLiroc:
+    # in-memory LIROC behind the SMBus.i2c_rdwr interface, usable as the bus of an I2C
+    def __init__(self, dev_address: int, registers: list = None, latency: float = 0.0, byte_time: float = 0.0):
+        self.address = dev_address
+        self.latency = latency
+        self.byte_time = byte_time
+
+        # (group, address) -> value, initialised from a register list such as Liroc().registers
+        self.memory = {(register.group, register.address): register.value for register in registers or []}
+        self.reset()
+
+    def reset(self) -> None:
+        self.transactions = 0
+        self.messages = 0
+        self.bytes = 0
+
+    def i2c_rdwr(self, *messages: i2c_msg) -> None:
+        size = 0
+        pointer = None
+        for message in messages:
+            if message.addr != self.address:
+                raise OSError(121, "Remote I/O error")
+
+            if message.flags & I2C_M_RD:
+                for i in range(message.len):
+                    message.buf[i] = bytes([self.memory.get(pointer, 0)])
+            else:
+                data = bytes(message)
+                pointer = I2C.decode(data[0], data[1])
+                if len(data) > 2:
+                    self.memory[pointer] = data[2]
+
+            # address byte + payload
+            size += 1 + message.len
+
+        self.transactions += 1
+        self.messages += len(messages)
+        self.bytes += size
+        if self.latency or self.byte_time:
+            time.sleep(self.latency + size * self.byte_time)
@@ -1,14 +1,120 @@
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
 from .blocks.channel import Channel
 from .blocks.common import Common
 
+from .components.register import read_registers, write_registers
+from .components.registermap import RegisterMap
 from .i2c.i2c import I2C
 
 
+class LazyChannels:
+    # sequence of channels created and read from hw on first access
+    def __init__(self, liroc: "Liroc", size: int = 64):
+        self._liroc = liroc
+        self._channels = [None] * size
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            indices = range(len(self))[index]
+            self._liroc.hydrate(indices)
+            return [self._channels[i] for i in indices]
+
+        channel = self._channels[index]
+        if channel is None:
+            self._liroc.hydrate([range(len(self))[index]])
+            channel = self._channels[index]
+        return channel
+
+    def __iter__(self):
+        self._liroc.hydrate(range(len(self)))
+        return iter(self._channels)
+
+    @property
+    def loaded(self) -> list:
+        return [i for i, channel in enumerate(self._channels) if channel is not None]
+
+
 class Liroc:
-    def __init__(self, i2c: I2C = None):
-        self.version = 1
-        self.channels = [Channel(i, i2c) for i in range(64)]
-        self.common = Common(i2c)
+    def __init__(self, i2c: I2C = None, lazy: bool = False, version: int = 1):
+        self.version = version
+        # block classes generated from the register map of this revision
+        self._channel = Channel.revision(version)
+        self._common_block = Common.revision(version)
+        self.register_map = RegisterMap.load(version)
+        self.i2c = i2c
+        self._lock = threading.RLock()
+
+        # exported images by revision, for incremental values()
+        self._exports = OrderedDict()
+        self._revision = 0
+
+        # nesting depth of batch(), flush() inside a batch is deferred
+        self._batches = 0
+        self._flush = False
+
+        if lazy:
+            self.channels = LazyChannels(self)
+            self._common = None
+            return
+
+        self.channels = [self._channel(i, i2c, read=False) for i in range(64)]
+        self._common = self._common_block(i2c, read=False)
+
+        # init from hw in bulk instead of per block
+        if self.i2c:
+            self.read()
+
+    @property
+    def lock(self) -> threading.RLock:
+        # the bus lock guards the shadow state of all chips on the bus
+        return self.i2c.lock if self.i2c else self._lock
+
+    @property
+    def common(self) -> Common:
+        if self._common is None:
+            self.hydrate([], common=True)
+        return self._common
+
+    def hydrate(self, channels, common: bool = False) -> None:
+        # create missing blocks of a lazy chip and read them from hw in one bulk read
+        if not isinstance(self.channels, LazyChannels):
+            return
+
+        with self.lock:
+            blocks = []
+            for i in channels:
+                if self.channels._channels[i] is None:
+                    blocks.append(self._channel(i, self.i2c, read=False))
+            if common and self._common is None:
+                blocks.append(self._common_block(self.i2c, read=False))
+
+            if self.i2c and blocks:
+                read_registers(self.i2c, [register for block in blocks for register in block.groups.registers])
+
+            for block in blocks:
+                if isinstance(block, Channel):
+                    self.channels._channels[block.index] = block
+                else:
+                    self._common = block
+
+    def prefetch(self, background: bool = False) -> threading.Thread | None:
+        # hydrate the whole chip in a single bulk read, optionally in a background thread
+        if not background:
+            self.hydrate(range(len(self.channels)), common=True)
+            return None
+
+        thread = threading.Thread(target=self.prefetch, daemon=True)
+        thread.start()
+        return thread
 
     def save(self):
         return {
@@ -17,14 +123,288 @@ class Liroc:
             "common": self.common.save()
         }
 
-    def load(self, configuration: dict):
-        if "version" in configuration:
-            if configuration["version"] >= self.version:
-                if "channels" in configuration:
-                    for channel in self.channels:
-                        channel.load(configuration["channels"][channel.index])
-                if "common" in configuration:
-                    self.common.load(configuration["common"])
+    def load(self, configuration: dict, apply: bool = False) -> list:
+        with self.lock:
+            previous = self.image
+
+            if "version" in configuration:
+                if configuration["version"] >= self.version:
+                    if "channels" in configuration:
+                        for channel in self.channels:
+                            channel.load(configuration["channels"][channel.index])
+                    if "common" in configuration:
+                        self.common.load(configuration["common"])
+
+            return self._apply(previous, apply)
+
+    def load_image(self, image: bytes, apply: bool = False) -> list:
+        with self.lock:
+            previous = self.image
+            if len(image) != len(previous):
+                raise ValueError(f"image size {len(image)} does not match chip image size {len(previous)}")
+            for register, value in zip(self.registers, image):
+                register.load(value)
+            return self._apply(previous, apply)
+
+    def _apply(self, previous: bytes, apply: bool) -> list:
+        # diff against the previous image, only changed registers need a write.
+        # Called with self.lock held
+        registers = self.registers
+        current = self.image
+        changes = [{"group": register.group,
+                    "address": register.address,
+                    "previous": old,
+                    "value": new}
+                   for register, old, new in zip(registers, previous, current) if old != new]
+
+        # back to the previous image and set the new one like a setter would, without
+        # a write the changed registers stay dirty for a later flush
+        for register, value in zip(registers, previous):
+            register.load(value)
+        self.set_bits(((register, register.mask, 0, value) for register, value in zip(registers, current)),
+                      write=apply and self.i2c is not None)
+
+        return changes
+
+    @property
+    def write_back(self) -> bool:
+        return all(block.groups.write_back for block in self.blocks)
+
+    @write_back.setter
+    def write_back(self, enable: bool) -> None:
+        for block in self.blocks:
+            block.groups.write_back = enable
+
+    @property
+    def blocks(self) -> list:
+        return list(self.channels) + [self.common]
+
+    @property
+    def registers(self) -> list:
+        return [register for block in self.blocks for register in block.groups.registers]
+
+    @property
+    def image(self) -> bytes:
+        # register values in the order of registers, the same layout as CompactLiroc.image
+        return bytes(register.value for register in self.registers)
+
+    def read(self) -> None:
+        read_registers(self.i2c, self.registers)
+
+    @contextmanager
+    def batch(self):
+        # setters only update the shadow inside the block, the changed registers are
+        # written in address order on exit or rolled back if the block raises. The
+        # lock is held for the whole block, so other threads cannot mix their changes in
+        with self.lock:
+            registers = self.registers
+            previous = self.image
+            state = [(register.write_back, register.dirty) for register in registers]
+            for register in registers:
+                register.write_back = True
+
+            deferred = self._flush
+            self._batches += 1
+            try:
+                yield self
+            except BaseException:
+                self._flush = deferred
+                for register, value, (write_back, dirty) in zip(registers, previous, state):
+                    register.load(value)
+                    register.write_back = write_back
+                    register.dirty = dirty
+                raise
+            finally:
+                self._batches -= 1
+
+            # an outer batch owns the deferred flush
+            flush = False
+            if self._batches == 0:
+                flush, self._flush = self._flush, False
+
+            writes = []
+            for register, value, (write_back, dirty) in zip(registers, previous, state):
+                register.write_back = write_back
+                if register.dirty and not dirty and register.value == value:
+                    # changed and changed back within the batch
+                    register.dirty = False
+                if register.dirty and (not write_back or flush):
+                    writes.append(register)
+
+            if self.i2c:
+                writes.sort(key=lambda register: (register.group, register.address))
+                write_registers(self.i2c, writes)
+
+    def verify(self) -> list:
+        # bulk readback compared to the shadow image, registers with pending
+        # write-back are expected to differ from hardware and are skipped
+        if not self.i2c:
+            return []
+
+        with self.lock:
+            registers = self.registers
+            values = self.i2c.read_many([register.i2c_address for register in registers], 1)
+            return [{"group": register.group,
+                     "address": register.address,
+                     "expected": register.value,
+                     "actual": value[0]}
+                    for register, value in zip(registers, values) if not register.dirty and register.value != value[0]]
+
+    def checksum(self) -> int:
+        return zlib.crc32(self.image)
+
+    def flush(self) -> None:
+        with self.lock:
+            if self._batches:
+                # deferred to the end of the batch, dropped on rollback
+                self._flush = True
+                return
+            if self.i2c:
+                write_registers(self.i2c, [register for register in self.registers if register.dirty])
+
+    def _channel_registers(self, name: str) -> tuple[list, int]:
+        # all channels share one compiled layout
+        g, r, f = self.channels[0].groups.index[name]
+        return [channel.groups[g][r] for channel in self.channels], f
+
+    def get_channel_field(self, name: str) -> np.ndarray:
+        registers, f = self._channel_registers(name)
+        return np.fromiter((register.fields[f].value for register in registers), dtype=np.uint8, count=len(registers))
+
+    def set_bits(self, updates, write: bool = True) -> list:
+        # updates of (register, mask, shift, value). Registers whose image does not change
+        # are skipped, the others are marked dirty and, unless in write-back, written in
+        # one bulk transfer. With write the bus is required like for the field setters,
+        # without it only the shadow is updated. Returns the changed registers
+        if write and not self.i2c:
+            return []
+
+        with self.lock:
+            changed = []
+            for register, mask, shift, value in updates:
+                image = (register.value & ~mask) | ((value << shift) & mask)
+                if image != register.value:
+                    register.load(image)
+                    register.dirty = True
+                    changed.append(register)
+
+            if write:
+                writes = [register for register in changed if not register.write_back]
+                writes.sort(key=lambda register: (register.group, register.address))
+                write_registers(self.i2c, writes)
+            return changed
+
+    def set_channel_field(self, name: str, values) -> None:
+        if not self.i2c:
+            return
+
+        registers, f = self._channel_registers(name)
+        field = registers[0].fields[f]
+
+        with self.lock:
+            # pack the field into all channel register images at once
+            images = np.fromiter((register.value for register in registers), dtype=np.uint8, count=len(registers))
+            values = np.broadcast_to(np.asarray(values, dtype=np.int64), images.shape) & ((1 << field.length) - 1)
+            updated = (images & (~field.bitmask & 0xFF)) | (values << field.start_bit).astype(np.uint8)
+
+            self.set_bits((registers[i], 0xFF, 0, int(updated[i])) for i in np.flatnonzero(updated != images))
+
+    def equalize_trims(self, measure, target: float, increasing: bool = False, channels=None) -> np.ndarray:
+        # lockstep bisection of DAC_local[6:0] over all channels: each round sets one bit on every
+        # channel in a single batched write and keeps it where the rate measure(self) returns does
+        # not pass the target. increasing tells whether the hit rate rises with DAC_local.
+        selected = np.zeros(len(self.channels), dtype=bool)
+        selected[np.arange(len(self.channels)) if channels is None else np.asarray(channels)] = True
+
+        initial = self.channel_by_channel_threshold_adjustment.astype(np.int64)
+        trims = np.where(selected, 0, initial)
+        for bit in reversed(range(7)):
+            trial = np.where(selected, trims | (1 << bit), initial)
+            self.channel_by_channel_threshold_adjustment = trial
+
+            rates = np.asarray(measure(self), dtype=float)
+            keep = rates <= target if increasing else rates >= target
+            trims = np.where(selected & keep, trial, trims)
+
+        self.channel_by_channel_threshold_adjustment = trims
+        return trims
+
+    @property
+    def injection_capacitance_connection_switch(self) -> np.ndarray:
+        return self.get_channel_field("Ctest")
+
+    @injection_capacitance_connection_switch.setter
+    def injection_capacitance_connection_switch(self, values) -> None:
+        self.set_channel_field("Ctest", values)
+
+    @property
+    def channel_by_channel_input_dc_level(self) -> np.ndarray:
+        return self.get_channel_field("DC_PA[5:0]")
+
+    @channel_by_channel_input_dc_level.setter
+    def channel_by_channel_input_dc_level(self, values) -> None:
+        self.set_channel_field("DC_PA[5:0]", values)
+
+    @property
+    def channel_by_channel_threshold_adjustment(self) -> np.ndarray:
+        return self.get_channel_field("DAC_local[6:0]")
+
+    @channel_by_channel_threshold_adjustment.setter
+    def channel_by_channel_threshold_adjustment(self, values) -> None:
+        self.set_channel_field("DAC_local[6:0]", values)
+
+    @property
+    def mask_trigger(self) -> np.ndarray:
+        return self.get_channel_field("Mask")
+
+    @mask_trigger.setter
+    def mask_trigger(self, values) -> None:
+        self.set_channel_field("Mask", values)
+
+    # number of exported revisions kept for values(since=...)
+    EXPORTS = 64
+
+    def metadata(self) -> str:
+        return self.register_map.metadata
+
+    def values(self, since: int = None) -> dict:
+        # field values only, in register map order. With since, only the fields that changed
+        # after that revision, or the full view if it is too old
+        image = self.image
+        with self._lock:
+            if not self._exports or self._exports[self._revision] != image:
+                self._revision += 1
+                self._exports[self._revision] = image
+                if len(self._exports) > self.EXPORTS:
+                    self._exports.popitem(last=False)
+            revision = self._revision
+            previous = self._exports.get(since) if since is not None else None
+
+        channel_fields = self.register_map.fields["channel"]
+        common_fields = self.register_map.fields["common"]
+        # registers per channel block, the common block follows the channels in the image
+        size = channel_fields[-1][0] + 1
+        common = size * len(self.channels)
+
+        def decode(image, offset, fields):
+            return [(image[offset + position] >> start_bit) & ((1 << length) - 1) for position, start_bit, length in fields]
+
+        if previous is None:
+            return {"revision": revision,
+                    "channels": [decode(image, i * size, channel_fields) for i in range(len(self.channels))],
+                    "common": decode(image, common, common_fields)}
+
+        channels = []
+        for i in range(len(self.channels)):
+            offset = i * size
+            if image[offset:offset + size] != previous[offset:offset + size]:
+                channels += [[i, f, value] for f, (value, old) in enumerate(zip(decode(image, offset, channel_fields),
+                                                                                 decode(previous, offset, channel_fields))) if value != old]
+        return {"revision": revision,
+                "since": since,
+                "channels": channels,
+                "common": [[f, value] for f, (value, old) in enumerate(zip(decode(image, common, common_fields),
+                                                                          decode(previous, common, common_fields))) if value != old]}
 
     def to_json(self):
         return {
@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from .liroc import Liroc
+from .i2c.i2c import I2C
+
+
+class LirocArray:
+    def __init__(self, buses: dict, addresses: dict):
+        # buses: bus id -> SMBus, addresses: bus id -> chip addresses on that bus
+        self.buses = buses
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(buses)))
+
+        keys = [(bus, address) for bus in buses for address in addresses.get(bus, [])]
+        try:
+            self.chips = self._map(lambda key: Liroc(I2C(self.buses[key[0]], key[1])), keys)
+        except BaseException:
+            self._executor.shutdown()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __getitem__(self, key: tuple) -> Liroc:
+        return self.chips[key]
+
+    def __iter__(self):
+        return iter(self.chips.items())
+
+    def __len__(self) -> int:
+        return len(self.chips)
+
+    def _map(self, function, keys=None) -> dict:
+        # one worker per bus, chips on the same bus are handled serially
+        keys = list(self.chips) if keys is None else keys
+        per_bus = {}
+        for key in keys:
+            per_bus.setdefault(key[0], []).append(key)
+
+        def run(bus_keys: list) -> list:
+            return [(key, function(key)) for key in bus_keys]
+
+        futures = [self._executor.submit(run, bus_keys) for bus_keys in per_bus.values()]
+        results = {}
+        for future in futures:
+            results.update(future.result())
+        return {key: results[key] for key in keys}
+
+    def read(self) -> None:
+        self._map(lambda key: self.chips[key].read())
+
+    def flush(self) -> None:
+        self._map(lambda key: self.chips[key].flush())
+
+    def verify(self) -> dict:
+        return self._map(lambda key: self.chips[key].verify())
+
+    def configure(self, configuration: dict, apply: bool = False) -> dict:
+        # the same configuration on every chip
+        return self._map(lambda key: self.chips[key].load(configuration, apply))
+
+    def save(self) -> dict:
+        configurations = self._map(lambda key: self.chips[key].save())
+        return {"chips": [{"bus": bus, "address": address, "configuration": configuration}
+                          for (bus, address), configuration in configurations.items()]}
+
+    def load(self, configuration: dict, apply: bool = False) -> dict:
+        configurations = {(chip["bus"], chip["address"]): chip["configuration"]
+                          for chip in configuration.get("chips", [])}
+        keys = [key for key in configurations if key in self.chips]
+        return self._map(lambda key: self.chips[key].load(configurations[key], apply), keys)
+
+    def close(self) -> None:
+        self._executor.shutdown()
@@ -0,0 +1,81 @@
+import threading
+import time
+
+from .liroc import Liroc
+from .components.register import write_registers
+
+
+class Scrubber:
+    # background SEU check: reads back a slice of the register image per tick while the bus is
+    # idle, compares it with the shadow state and optionally rewrites corrupted registers
+    def __init__(self, liroc: Liroc, interval: float = 0.1, slice_size: int = 8, idle: float = 0.05, repair: bool = False):
+        self.liroc = liroc
+        self.interval = interval
+        self.slice_size = slice_size
+        self.idle = idle
+        self.repair = repair
+
+        self.upsets = []
+        self.scrubbed = 0
+        self.skipped = 0
+        self._position = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def step(self) -> list | None:
+        # one slice, None if the bus was busy and the slice was skipped
+        registers = self.liroc.registers
+        registers = registers[self._position:self._position + self.slice_size]
+
+        def compare(values: list) -> list:
+            # runs under the bus lock of the readback, so no foreground write can land in between
+            upsets = []
+            corrupted = []
+            for register, value in zip(registers, values):
+                # pending write-back is expected to differ from hardware
+                if not register.dirty and register.value != value[0]:
+                    corrupted.append(register)
+                    upsets.append({"group": register.group,
+                                   "address": register.address,
+                                   "expected": register.value,
+                                   "actual": value[0],
+                                   "time": time.time()})
+
+            if self.repair and corrupted:
+                write_registers(self.liroc.i2c, corrupted)
+            return upsets
+
+        upsets = self.liroc.i2c.read_many_if_idle([register.i2c_address for register in registers], self.idle, callback=compare)
+        if upsets is None:
+            self.skipped += 1
+            return None
+
+        self.upsets += upsets
+        self.scrubbed += len(registers)
+        self._position += len(registers)
+        if self._position >= len(self.liroc.registers):
+            self._position = 0
+        return upsets
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.step()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,134 @@
+import mmap
+import os
+import struct
+
+from .liroc import Liroc
+from .compact import CompactLiroc
+
+# snapshot: header followed by the raw register image of one chip
+MAGIC = b"LRCS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHH")  # magic, format version, chip version, image size
+
+# archive: file header followed by appended records of (run, chip, snapshot size, snapshot)
+ARCHIVE_MAGIC = b"LRCA"
+ARCHIVE_HEADER = struct.Struct("<4sH")  # magic, format version
+RECORD = struct.Struct("<QII")  # run, chip, snapshot size
+
+
+def dumps(liroc: Liroc | CompactLiroc) -> bytes:
+    image = bytes(liroc.image)
+    return HEADER.pack(MAGIC, FORMAT_VERSION, liroc.version, len(image)) + image
+
+
+def image_of(data: bytes) -> tuple[int, bytes]:
+    magic, format_version, version, size = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a LIROC snapshot")
+    if format_version > FORMAT_VERSION:
+        raise ValueError(f"unsupported snapshot format version {format_version}")
+    image = bytes(data[HEADER.size:HEADER.size + size])
+    if len(image) != size:
+        raise ValueError("truncated LIROC snapshot")
+    return version, image
+
+
+def loads(data: bytes, liroc: Liroc | CompactLiroc = None, apply: bool = False) -> Liroc | CompactLiroc:
+    # into an existing chip (only the changed registers are written with apply), or a new CompactLiroc
+    version, image = image_of(data)
+    liroc = CompactLiroc() if liroc is None else liroc
+    if version < liroc.version:
+        raise ValueError(f"snapshot version {version} is older than chip version {liroc.version}")
+    if len(image) != len(liroc.image):
+        raise ValueError(f"snapshot image size {len(image)} does not match chip image size {len(liroc.image)}")
+
+    if isinstance(liroc, Liroc):
+        liroc.load_image(image, apply)
+    else:
+        liroc.load_image(image)
+    return liroc
+
+
+def from_configuration(configuration: dict) -> bytes:
+    liroc = CompactLiroc()
+    liroc.load(configuration)
+    return dumps(liroc)
+
+
+def to_configuration(data: bytes) -> dict:
+    return loads(data).save()
+
+
+class SnapshotArchive:
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "a+b")
+        if os.fstat(self.file.fileno()).st_size == 0:
+            self.file.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, FORMAT_VERSION))
+            self.file.flush()
+
+        self._map = None
+        self._scanned = ARCHIVE_HEADER.size
+        # (run, chip) -> (offset, size) of the snapshot, the last record wins
+        self.index = {}
+        self._scan()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __contains__(self, key) -> bool:
+        self._scan()
+        return key in self.index
+
+    def _scan(self) -> None:
+        # read record headers appended since the last scan, payloads are skipped
+        size = os.fstat(self.file.fileno()).st_size
+        if self._map is not None and len(self._map) == size:
+            return
+
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self.file.fileno(), size, access=mmap.ACCESS_READ)
+
+        magic, format_version = ARCHIVE_HEADER.unpack_from(self._map)
+        if magic != ARCHIVE_MAGIC:
+            raise ValueError(f"{self.path} is not a LIROC snapshot archive")
+        if format_version > FORMAT_VERSION:
+            raise ValueError(f"unsupported archive format version {format_version}")
+
+        offset = self._scanned
+        while offset + RECORD.size <= size:
+            run, chip, length = RECORD.unpack_from(self._map, offset)
+            if offset + RECORD.size + length > size:
+                # incomplete record of an interrupted append
+                break
+            self.index[(run, chip)] = (offset + RECORD.size, length)
+            offset += RECORD.size + length
+        self._scanned = offset
+
+    def append(self, run: int, liroc: Liroc | CompactLiroc | bytes, chip: int = 0) -> None:
+        data = liroc if isinstance(liroc, (bytes, bytearray)) else dumps(liroc)
+        self.file.seek(0, os.SEEK_END)
+        self.file.write(RECORD.pack(run, chip, len(data)) + data)
+        self.file.flush()
+
+    def runs(self, chip: int = None) -> list:
+        self._scan()
+        return sorted({run for run, c in self.index if chip is None or c == chip})
+
+    def get(self, run: int, chip: int = 0) -> bytes:
+        self._scan()
+        offset, length = self.index[(run, chip)]
+        return self._map[offset:offset + length]
+
+    def load(self, run: int, liroc: Liroc | CompactLiroc = None, chip: int = 0, apply: bool = False) -> Liroc | CompactLiroc:
+        return loads(self.get(run, chip), liroc, apply)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self.file.close()
@@ -0,0 +1,31 @@
+import numpy as np
+
+from .liroc import Liroc
+
+
+def threshold_sweep(liroc: Liroc, values, callback=None):
+    # 10-bit global threshold, each step writes only the registers whose half changed
+    register_msb, field_msb = liroc.common.groups.get_field("dac_threshold[9:8]")
+    register_lsb, field_lsb = liroc.common.groups.get_field("dac_threshold[7:0]")
+
+    for value in values:
+        liroc.set_bits(((register_msb, field_msb.bitmask, field_msb.start_bit, value >> 8),
+                        (register_lsb, field_lsb.bitmask, field_lsb.start_bit, value & 0xFF)))
+
+        if callback:
+            callback(value)
+        yield value
+
+
+def local_threshold_sweep(liroc: Liroc, values, channels=None, callback=None):
+    # 7-bit DAC_local of the selected channels (default all), the others keep their trim
+    channels = np.arange(len(liroc.channels)) if channels is None else np.asarray(channels)
+
+    for value in values:
+        trims = liroc.channel_by_channel_threshold_adjustment
+        trims[channels] = value
+        liroc.channel_by_channel_threshold_adjustment = trims
+
+        if callback:
+            callback(value)
+        yield value